@@ -24,14 +24,14 @@ mirogate = generate_miro()
 def generate_HHL():
     def hadamard(theta: int = 0):
         return np.array([[np.cos(2*theta), np.sin(2*theta)],[np.sin(2*theta), -np.cos(2*theta)]])
-    H = UGate(hadamard(), "H")
+    H = UGate(hadamard(), gatename="H")
     RCH8 = CUGate(hadamard(np.pi/8), "H8", flipped=True)
     RCH16 = CUGate(hadamard(np.pi/16), "H16", flipped=True)
     RCY = CUGate(np.array([[0,-1j],[1j,0]]), "CY", flipped=True)
     RCNOT = UGate(np.array([[0,1,0,0],
                             [1,0,0,0],
                             [0,0,1,0],
-                            [0,0,0,1]]), "RCNOT")
+                            [0,0,0,1]]), gatename="RCNOT")
     SWAP = UGate(np.array([[1,0,0,0],
                             [0,0,1,0],
                             [0,1,0,0],
@@ -45,7 +45,7 @@ def generate_HHL():
     CAU = CUGate(AU, "CA")
     CSH = CUGate(np.array([[1,0],[0,-1j]]), "CSH")
 
-    X = UGate(np.array([[0,1],[1,0]]), "X")
+    X = UGate(np.array([[0,1],[1,0]]), gatename="X")
     I = IdentityGate()
 
     circuit = ProductGate()
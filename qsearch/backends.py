@@ -35,6 +35,8 @@ class SmartDefaultBackend(Backend):
     """This Backend tries to use the native Rust code, but will gracefully fallback to Python if there is an issue."""
 
     def prepare_circuit(self, circuit, options=None):
+        if not RUST_ENABLED:
+            return circuit # skip raising and catching an exception for every circuit when qsrs is not installed
         try:
             return native_from_object(circuit)
         except:
@@ -37,10 +37,13 @@ class SearchCompiler(Compiler):
         beams : The number of nodes to pop from the search tree at a time.  The default value of -1 will create enough branches to maximize utilization of your CPU.
         error_func : The function that the Solver will attempt to minimize.
         eval_func : The function used by the heuristic in order to guide the search tree.  By default this is equal to error_func.
+        eval_target : The unitary that eval_func compares solved circuits against.  By default this is target after it is passed through unitary_preprocessor.
         error_jac : A function that returns a tuple of the value that error_func would generate and the jacobian of error_func
         error_residuals : A function that returns an array of real-valued residuals to be used by a least-squares-based Solver.
         error_residuals_jac : A function that returns the jacobian of error_residuals (note that it does NOT return a tuple of the residuals and the jacobian).
         timeout : An uper limit on the amount of time the compiler will spend trying to synthesize a circuit.  The default is float('inf'), for unlimited.
+        max_queue : An upper limit on the number of nodes kept in the search tree's frontier.  After each layer only the best max_queue nodes are kept.  The default is None for unlimited.
+        skip_duplicate_successors : If True, a structure that the search has already solved is not solved again when another node generates it as a successor.  This is only useful for gatesets whose successors can coincide; none of the built-in gatesets do.  The default is False.
         checkpoint : The compiler will use this Checkpoint to save intermediate state, and will resume from this Checkpoint if there was an existing state.
         logger : A qsearch.logging.Logger that will be used for logging the synthesis process.
 
@@ -63,15 +66,14 @@ class SearchCompiler(Compiler):
         options = self.options.updated(options)
         options.make_required("target")
 
-        if "unitary_preprocessor" in options:
-            U = options.unitary_preprocessor(options.target)
+        U = options.eval_target
         weight_limit = options.weight_limit
         checkpoint = options.checkpoint
         logger = options.logger
 
         starttime = timer() #NOTE because all of this setup gets included in the total time, stopping and restarting the project may lead to time durations that are not representative of the runtime under normal conditions.
         h = options.heuristic
-        qudits = int(np.round(np.log(np.shape(U)[0])/np.log(options.gateset.d)))
+        qudits = utils.num_qudits(np.shape(U)[0], options.gateset.d)
 
         if options.gateset.d**qudits != np.shape(U)[0]:
             raise ValueError("The target matrix of size {} is not compatible with qudits of size {}.".format(np.shape(U)[0], self.options.gateset.d))
@@ -146,6 +148,9 @@ class SearchCompiler(Compiler):
                 raise options.load_error
             logger.logprint("Recovered state with best result {} at weight {}".format(best_value, best_weight))
 
+        # hashes of structures that have already been solved, so they are not solved again if a successor reaches them through another path; the structures themselves are not kept, so trimmed nodes can be freed
+        visited = {hash(tup[5]) for tup in queue} if 'skip_duplicate_successors' in options and options.skip_duplicate_successors else None
+        max_queue = options.max_queue if 'max_queue' in options else None
         options.generate_cache() # Cache the results of smart_default settings, such as the default solver, before entering the main loop where the options will get pickled and the smart_default functions called many times because later caching won't persist cause of pickeling and multiple processes.
         try:
             while len(queue) > 0:
@@ -163,16 +168,23 @@ class SearchCompiler(Compiler):
                     logger.logprint("Popped a node with score: {} at weight: {}".format((tup[2]), tup[1]), verbosity=2)
 
                 then = timer()
-                new_steps = [(successor[0], current_tup[1], successor[1]) for current_tup in popped for successor in options.gateset.successors(current_tup[5])]
-                for step, result, current_weight, weight in parallel.solve_circuits_parallel(new_steps):
-                    current_value = options.eval_func(U, result[0])
+                new_steps = []
+                for current_tup in popped:
+                    for successor in options.gateset.successors(current_tup[5]):
+                        if visited is not None:
+                            key = hash(successor[0])
+                            if key in visited:
+                                continue
+                            visited.add(key)
+                        new_steps.append((successor[0], current_tup[1], successor[1]))
+                for step, parameters, current_value, current_weight, weight in parallel.solve_circuits_parallel(new_steps):
                     new_weight = current_weight + weight
 
 # EDITS
                     logger.logprint("check score: {} at weight: {}".format(current_value, new_weight))
                     if current_value < 0.1:
                         out_dict['structure'] = step
-                        out_dict['parameters'] = result[1]
+                        out_dict['parameters'] = parameters
                         out = options.assembler.assemble(out_dict, options)
                         if options.write_location is not None:
                             qasm_itr += 1
@@ -185,12 +197,14 @@ class SearchCompiler(Compiler):
 
                     if (current_value < best_value and (best_value >= options.threshold or new_weight <= best_weight)) or (current_value < options.threshold and new_weight < best_weight):
                         best_value = current_value
-                        best_pair = (step, result[1])
+                        best_pair = (step, parameters)
                         best_weight = new_weight
                         logger.logprint("New best! score: {} at weight: {}".format(best_value, new_weight))
                     if weight_limit is None or new_weight < weight_limit:
-                        heapq.heappush(queue, (h(step, result[1], new_weight, options), new_weight, current_value, tiebreaker, result[1], step))
+                        heapq.heappush(queue, (h(step, parameters, new_weight, options), new_weight, current_value, tiebreaker, parameters, step))
                         tiebreaker+=1
+                if max_queue is not None and len(queue) > max_queue:
+                    queue = heapq.nsmallest(max_queue, queue) # a sorted list is still a valid heap
                 logger.logprint("Layer completed after {} seconds".format(timer() - then), verbosity=2)
                 checkpoint.save((options, queue, best_weight, best_value, best_pair, tiebreaker, rectime+(timer()-starttime)))
         finally:
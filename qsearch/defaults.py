@@ -18,6 +18,11 @@ import numpy as np
 def default_eval_func(options):
         return options.error_func
 
+def default_eval_target(options):
+    if "unitary_preprocessor" in options:
+        return options.unitary_preprocessor(options.target)
+    return options.target
+
 def default_heuristic(options):
     if options.search_type == "astar":
         return heuristics.astar
@@ -98,12 +103,15 @@ standard_defaults = {
         "write_location" : None,
         "unitary_preprocessor": utils.nearest_unitary,
         "timeout" : float('inf'),
+        "max_queue" : None,
+        "skip_duplicate_successors" : False,
         "blas_threads" : None,
         "verbosity" : 1,
         "stdout_enabled" : True,
         }
 standard_smart_defaults = {
         "eval_func":default_eval_func,
+        "eval_target":default_eval_target,
         "error_jac":default_error_jac,
         "error_residuals_jac":default_error_residuals_jac,
         "solver":solvers.default_solver,
@@ -4,7 +4,11 @@ This module defines the Gate class, which represents a quantum gate, as well as
 Through the use of KroneckerGate and ProductGate, Gates can be formed for complex circuit structures.  The matrix and mat_jac functions are used for numerical optimization of parameterized gates.  The assemble function is used to generate an intermediate language of tuples that can be used by Assemblers to output descriptions of quantum circuits in other formats.
 """
 
+import math
+import cmath
 import numpy as np
+from functools import lru_cache
+from scipy.linalg.blas import zgemm
 from . import utils, unitaries
 from hashlib import md5
 
@@ -13,8 +17,47 @@ try:
 except ImportError:
     native_from_object = None
 
+@lru_cache(maxsize=None)
+def _identity(n):
+    """Returns an n by n identity matrix that is shared between every caller, so it must not be modified."""
+    return np.eye(n, dtype='complex128')
+
+@lru_cache(maxsize=None)
+def _arbitrary_cnot(qudits, control, target):
+    """A shared copy of unitaries.arbitrary_cnot, which is slow to build."""
+    return unitaries.arbitrary_cnot(qudits, control, target)
+
+def _input_slices(gates):
+    """Returns the slice of a combined parameter vector that belongs to each of gates."""
+    slices = []
+    index = 0
+    for gate in gates:
+        slices.append(slice(index, index+gate.num_inputs))
+        index += gate.num_inputs
+    return slices
+
+def _kron(A, B):
+    """Equivalent to np.kron(A, B) for two matrices, computed with a single broadcasted multiply."""
+    return (A[:, None, :, None] * B[None, :, None, :]).reshape(A.shape[0]*B.shape[0], A.shape[1]*B.shape[1])
+
+def _kron_eye(A, k):
+    """Equivalent to np.kron(A, np.eye(k)), filling the diagonal blocks directly instead of multiplying by zeros."""
+    out = np.zeros((A.shape[0], k, A.shape[1], k), dtype=A.dtype)
+    for i in range(k):
+        out[:, i, :, i] = A
+    return out.reshape(A.shape[0]*k, A.shape[1]*k)
+
+def _eye_kron(k, B):
+    """Equivalent to np.kron(np.eye(k), B), filling the diagonal blocks directly instead of multiplying by zeros."""
+    out = np.zeros((k, B.shape[0], k, B.shape[1]), dtype=B.dtype)
+    for i in range(k):
+        out[i, :, i, :] = B
+    return out.reshape(k*B.shape[0], k*B.shape[1])
+
 class Gate():
     """This class shows the framework for working with quantum gates in Qsearch."""
+    _perm = None # for constant gates that are permutations, the row indices such that matrix([]) @ M == M[_perm]
+
     def __init__(self):
         """Gates must set the following variables in __init__
         
@@ -35,6 +78,22 @@ class Gate():
         """
         raise NotImplementedError("Subclasses of Gate are required to implement the matrix(v) method.")
 
+    def batch_matrix(self, V):
+        """Generates the matrices for many parameter vectors at once, such as for a population-based Solver.
+
+        The default implementation simply calls matrix(v) for each row.  Gates that can vectorize their matrix construction across the rows may override it.
+
+        Args:
+            V : A 2d numpy array of real floating point numbers, with one row of self.num_inputs parameters per matrix.
+
+        Returns:
+            np.ndarray : An array of shape (len(V), N, N) where entry i is matrix(V[i]).  It may be a read-only broadcasted view for constant gates.
+        """
+        if self.num_inputs == 0:
+            U = self.matrix([])
+            return np.broadcast_to(U, (len(V),) + U.shape)
+        return np.array([self.matrix(v) for v in V], dtype='complex128')
+
     def mat_jac(self, v):
         """Generates a matrix and the jacobian(s) using the given vector of input parameters.
 
@@ -112,7 +171,7 @@ class IdentityGate(Gate):
             d : The size of qudits represented by this identity (2 for qubits, 3 for qutrits, etc.)
         """
         self.num_inputs=0
-        self._I = np.array(np.eye(d**qudits), dtype='complex128')
+        self._I = _identity(d**qudits)
         self.qudits = qudits
         self._d = d
 
@@ -122,6 +181,9 @@ class IdentityGate(Gate):
     def assemble(self, v, i=0):
         return []
 
+    def __reduce__(self):
+        return (IdentityGate, (self.qudits, self._d))
+
     def __repr__(self):
         if self.qudits == 1 and self._d == 2:
             return "IdentityGate()"
@@ -195,47 +257,31 @@ class ZXZXZGate(Gate):
         self.num_inputs = 3
         self.qudits = 1
 
-        self._x90 = unitaries.rot_x(np.pi/2)
-        self._rot_z = unitaries.rot_z(0)
-        self._out = np.array(np.eye(2), dtype='complex128')
-        self._buffer = np.array(np.eye(2), dtype = 'complex128')
-       
     def matrix(self, v):
-        utils.re_rot_z(v[0], self._rot_z)
-        self._out = np.dot(self._x90, self._rot_z, out=self._out)
-        utils.re_rot_z(v[1], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._out, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z(v[2], self._rot_z)
-        return np.dot(self._rot_z, self._out)
+        # closed form of rot_z(v[2]) * rot_x(pi/2) * rot_z(v[1]) * rot_x(pi/2) * rot_z(v[0])
+        sb = math.sin(v[1]/2)
+        cb = math.cos(v[1]/2)
+        pp = cmath.exp(0.5j * (v[0] + v[2]))
+        pm = cmath.exp(0.5j * (v[0] - v[2]))
+        return np.array([[-1j * sb / pp, -1j * cb * pm], [-1j * cb / pm, 1j * sb * pp]], dtype='complex128')
+
+    def batch_matrix(self, V):
+        V = np.asarray(V)
+        sb = np.sin(V[:,1]/2)
+        cb = np.cos(V[:,1]/2)
+        pp = np.exp(0.5j * (V[:,0] + V[:,2]))
+        pm = np.exp(0.5j * (V[:,0] - V[:,2]))
+        return np.stack([np.stack([-1j * sb / pp, -1j * cb * pm], axis=-1), np.stack([-1j * cb / pm, 1j * sb * pp], axis=-1)], axis=-2)
 
     def mat_jac(self, v):
-        utils.re_rot_z_jac(v[0], self._rot_z)
-        self._out = np.dot(self._x90, self._rot_z, out=self._out)
-        utils.re_rot_z(v[1], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._out, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z(v[2], self._rot_z)
-        J1 = np.dot(self._rot_z, self._out)
-
-        utils.re_rot_z(v[0], self._rot_z)
-        self._out = np.dot(self._x90, self._rot_z, out=self._out)
-        utils.re_rot_z_jac(v[1], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._out, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z(v[2], self._rot_z)
-        J2 = np.dot(self._rot_z, self._out)
-
-        utils.re_rot_z(v[0], self._rot_z)
-        self._out = np.dot(self._x90, self._rot_z, out=self._out)
-        utils.re_rot_z(v[1], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._out, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z_jac(v[2], self._rot_z)
-        J3 = np.dot(self._rot_z, self._out)
-        
-        utils.re_rot_z(v[2], self._rot_z)
-        U = np.dot(self._rot_z, self._out)
+        sb = math.sin(v[1]/2)
+        cb = math.cos(v[1]/2)
+        pp = cmath.exp(0.5j * (v[0] + v[2]))
+        pm = cmath.exp(0.5j * (v[0] - v[2]))
+        U = np.array([[-1j * sb / pp, -1j * cb * pm], [-1j * cb / pm, 1j * sb * pp]], dtype='complex128')
+        J1 = np.array([[-0.5 * sb / pp, 0.5 * cb * pm], [-0.5 * cb / pm, -0.5 * sb * pp]], dtype='complex128')
+        J2 = np.array([[-0.5j * cb / pp, 0.5j * sb * pm], [0.5j * sb / pm, 0.5j * cb * pp]], dtype='complex128')
+        J3 = np.array([[-0.5 * sb / pp, -0.5 * cb * pm], [0.5 * cb / pm, -0.5 * sb * pp]], dtype='complex128')
         return (U, [J1, J2, J3])
 
     def assemble(self, v, i=0):
@@ -257,34 +303,20 @@ class XZXZGate(Gate):
         self.num_inputs = 2
         self.qudits = 1
 
-        self._x90 = unitaries.rot_x(np.pi/2)
-        self._rot_z = unitaries.rot_z(0)
-        self._out = np.array(np.eye(2), dtype='complex128')
-        self._buffer = np.array(np.eye(2), dtype = 'complex128')
-        # need two buffers due to a bug in some implementations of numpy
-        
     def matrix(self, v):
-        utils.re_rot_z(v[0], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._x90, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z(v[1], self._rot_z)
-        return np.dot(self._rot_z, self._out)
+        # closed form of rot_z(v[1]) * rot_x(pi/2) * rot_z(v[0]) * rot_x(pi/2)
+        sb = math.sin(v[0]/2)
+        cb = math.cos(v[0]/2)
+        ep = cmath.exp(0.5j * v[1])
+        return np.array([[-1j * sb / ep, -1j * cb / ep], [-1j * cb * ep, 1j * sb * ep]], dtype='complex128')
 
     def mat_jac(self, v):
-        utils.re_rot_z_jac(v[0], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._x90, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z(v[1], self._rot_z)
-        J1 = np.dot(self._rot_z, self._out)
-
-        utils.re_rot_z(v[0], self._rot_z)
-        self._buffer = np.dot(self._rot_z, self._x90, out=self._buffer)
-        self._out = np.dot(self._x90, self._buffer, out=self._out)
-        utils.re_rot_z_jac(v[1], self._rot_z)
-        J2 = np.dot(self._rot_z, self._out)
-
-        utils.re_rot_z(v[1], self._rot_z)
-        U = np.dot(self._rot_z, self._out)
+        sb = math.sin(v[0]/2)
+        cb = math.cos(v[0]/2)
+        ep = cmath.exp(0.5j * v[1])
+        U = np.array([[-1j * sb / ep, -1j * cb / ep], [-1j * cb * ep, 1j * sb * ep]], dtype='complex128')
+        J1 = np.array([[-0.5j * cb / ep, 0.5j * sb / ep], [0.5j * sb * ep, 0.5j * cb * ep]], dtype='complex128')
+        J2 = np.array([[-0.5 * sb / ep, -0.5 * cb / ep], [0.5 * cb * ep, -0.5 * sb * ep]], dtype='complex128')
         return (U, [J1, J2])
 
     def assemble(self, v, i=0):
@@ -296,6 +328,13 @@ class XZXZGate(Gate):
         out.append(("gate", "Z", (v[1],), (i,)))
         return [("block", out)]
  
+    def batch_matrix(self, V):
+        V = np.asarray(V)
+        sb = np.sin(V[:,0]/2)
+        cb = np.cos(V[:,0]/2)
+        ep = np.exp(0.5j * V[:,1])
+        return np.stack([np.stack([-1j * sb / ep, -1j * cb / ep], axis=-1), np.stack([-1j * cb * ep, 1j * sb * ep], axis=-1)], axis=-2)
+
     def __repr__(self):
         return "XZXZGate()"
 
@@ -306,27 +345,31 @@ class U3Gate(Gate):
         self.qudits = 1
 
     def matrix(self, v):
-        ct = np.cos(v[0]/2)
-        st = np.sin(v[0]/2)
-        cp = np.cos(v[1])
-        sp = np.sin(v[1])
-        cl = np.cos(v[2])
-        sl = np.sin(v[2])
-        return np.array([[ct, -st * (cl + 1j * sl)], [st * (cp + 1j * sp), ct * (cl * cp - sl * sp + 1j * cl * sp + 1j * sl * cp)]], dtype='complex128')
-
+        # scalar math/cmath calls avoid the ufunc dispatch overhead that dominates for a 2x2 matrix
+        ct = math.cos(v[0]/2)
+        st = math.sin(v[0]/2)
+        ep = cmath.exp(1j * v[1])
+        el = cmath.exp(1j * v[2])
+        return np.array([[ct, -st * el], [st * ep, ct * ep * el]], dtype='complex128')
+
+    def batch_matrix(self, V):
+        V = np.asarray(V)
+        ct = np.cos(V[:,0]/2)
+        st = np.sin(V[:,0]/2)
+        ep = np.exp(1j * V[:,1])
+        el = np.exp(1j * V[:,2])
+        return np.stack([np.stack([ct, -st * el], axis=-1), np.stack([st * ep, ct * ep * el], axis=-1)], axis=-2)
 
     def mat_jac(self, v):
-        ct = np.cos(v[0]/2)
-        st = np.sin(v[0]/2)
-        cp = np.cos(v[1])
-        sp = np.sin(v[1])
-        cl = np.cos(v[2])
-        sl = np.sin(v[2])
-
-        U = np.array([[ct, -st * (cl + 1j * sl)], [st * (cp + 1j * sp), ct * (cl * cp - sl * sp + 1j * cl * sp + 1j * sl * cp)]], dtype='complex128')
-        J1 = np.array([[-0.5*st, -0.5*ct * (cl + 1j * sl)], [0.5*ct * (cp + 1j * sp), -0.5*st * (cl * cp - sl * sp + 1j * cl * sp + 1j * sl * cp)]], dtype='complex128')
-        J2 = np.array([[0, 0], [st *(-sp + 1j * cp), ct *(cl * -sp - sl * cp + 1j * cl * cp + 1j * sl * -sp)]], dtype='complex128')
-        J3 = np.array([[0, -st *(-sl + 1j * cl)], [0, ct *(-sl * cp - cl * sp + 1j * -sl * sp + 1j * cl * cp)]], dtype='complex128')
+        ct = math.cos(v[0]/2)
+        st = math.sin(v[0]/2)
+        ep = cmath.exp(1j * v[1])
+        el = cmath.exp(1j * v[2])
+
+        U = np.array([[ct, -st * el], [st * ep, ct * ep * el]], dtype='complex128')
+        J1 = np.array([[-0.5*st, -0.5*ct * el], [0.5*ct * ep, -0.5*st * ep * el]], dtype='complex128')
+        J2 = np.array([[0, 0], [1j * st * ep, 1j * ct * ep * el]], dtype='complex128')
+        J3 = np.array([[0, -1j * st * el], [0, 1j * ct * ep * el]], dtype='complex128')
         return (U, [J1, J2, J3])
 
     def assemble(self, v, i=0):
@@ -560,20 +603,21 @@ class CPIGate(Gate):
 
 class CPIPhaseGate(Gate):
     """Represents the constant two-qutrit gate CPI with phase differences."""
+    _template = np.array([[1,0,0, 0,0,0, 0,0,0],
+                           [0,1,0, 0,0,0, 0,0,0],
+                           [0,0,1, 0,0,0, 0,0,0],
+                           [0,0,0, 0,-1,0,0,0,0],
+                           [0,0,0, 1,0,0, 0,0,0],
+                           [0,0,0, 0,0,1, 0,0,0],
+                           [0,0,0, 0,0,0, 1,0,0],
+                           [0,0,0, 0,0,0, 0,1,0],
+                           [0,0,0, 0,0,0, 0,0,1]
+                          ], dtype='complex128')
+
     def __init__(self):
         self.num_inputs = 0
-        self._cpi = np.array([[1,0,0, 0,0,0, 0,0,0],
-                               [0,1,0, 0,0,0, 0,0,0],
-                               [0,0,1, 0,0,0, 0,0,0],
-                               [0,0,0, 0,-1,0,0,0,0],
-                               [0,0,0, 1,0,0, 0,0,0],
-                               [0,0,0, 0,0,1, 0,0,0],
-                               [0,0,0, 0,0,0, 1,0,0],
-                               [0,0,0, 0,0,0, 0,1,0],
-                               [0,0,0, 0,0,0, 0,0,1]
-                              ], dtype='complex128')
-        diag_mod = np.array(np.diag([1]*4 + [np.exp(2j * np.random.random()*np.pi) for _ in range(0,5)]))
-        self._cpi = np.matmul(self._cpi, diag_mod)
+        phases = np.concatenate([np.ones(4), np.exp(2j * np.pi * np.random.random(5))])
+        self._cpi = CPIPhaseGate._template * phases[None, :] # scaling the columns is the same as multiplying by diag(phases)
         self.qudits = 2
 
     def matrix(self, v):
@@ -591,6 +635,7 @@ class CNOTGate(Gate):
                        [0,1,0,0],
                        [0,0,0,1],
                        [0,0,1,0]], dtype='complex128')
+    _perm = np.array([0,1,3,2], dtype=np.intp)
 
     def __init__(self):
         self.num_inputs = 0
@@ -691,14 +736,20 @@ class NonadjacentCNOTGate(Gate):
         self.num_inputs = 0
         self.control = control
         self.target = target
-        self._U = unitaries.arbitrary_cnot(qudits, control, target)
+        if control != target and 0 <= control < qudits and 0 <= target < qudits:
+            # flip the target bit of every index whose control bit is set; qudit 0 is the most significant bit
+            rows = np.arange(2**qudits, dtype=np.intp)
+            self._perm = np.where(rows & (1 << (qudits-control-1)), rows ^ (1 << (qudits-target-1)), rows)
 
     def matrix(self, v):
-        return self._U
+        return _arbitrary_cnot(self.qudits, self.control, self.target)
 
     def assemble(self, v, i=0):
         return [("gate", "CNOT", (), (self.control, self.target))]
 
+    def __reduce__(self):
+        return (NonadjacentCNOTGate, (self.qudits, self.control, self.target))
+
     def __repr__(self):
         return "NonadjacentCNOTGate({}, {}, {})".format(self.qudits, self.control, self.target)
 
@@ -724,7 +775,7 @@ class UGate(Gate):
         """
         self.d = d
         self.U = U
-        self.qudits = int(np.log(U.shape[0])/np.log(2))
+        self.qudits = utils.num_qudits(U.shape[0], self.d)
         self.num_inputs = 0
         self.gatename = gatename
         self.gateparams = gateparams
@@ -740,10 +791,7 @@ class UGate(Gate):
         return [("gate", gatename, gateparams, indices)]
 
     def __repr__(self):
-        if self.d == 2:
-            return "UGate({})".format(repr(U))
-        else:
-            return "UGate({}, d={})".format(repr(U), self.d)
+        return "UGate(" + repr(self.U) + ("" if self.d == 2 else ", d={}".format(self.d)) + ("" if self.gatename == "CUSTOM" else ", gatename={}".format(repr(self.gatename))) + ("" if self.gateparams == () else ", gateparams={}".format(repr(self.gateparams))) + ("" if self.gateindices is None else ", gateindices={}".format(repr(self.gateindices))) + ")"
 
 class UpgradedConstantGate(Gate):
     """Represents a constant gate, based on the Gate passed to its initializer, but upgraded to act on qudits of a larger size."""
@@ -771,6 +819,9 @@ class UpgradedConstantGate(Gate):
     def assemble(self, v, i=0):
         return self.subgate.assemble(v, i)
 
+    def __reduce__(self):
+        return (UpgradedConstantGate, (self.subgate, self.df))
+
     def __repr__(self):
         return "UpgradedConstantGate({}, df={})".format(repr(self.subgate), self.df)
 
@@ -791,10 +842,14 @@ class CUGate(Gate):
         self.num_inputs = 0
         self._U = U
         n = np.shape(U)[0]
-        I = np.array(np.eye(n))
-        top = np.pad(self._U if flipped else I, [(0,n),(0,n)], 'constant')
-        bot = np.pad(I if flipped else self._U, [(n,0),(n,0)], 'constant')
-        self._CU = np.array(top + bot)
+        # U fills one diagonal block and the identity the other
+        self._CU = np.zeros((2*n, 2*n), dtype='complex128')
+        if flipped:
+            self._CU[:n, :n] = U
+            np.fill_diagonal(self._CU[n:, n:], 1)
+        else:
+            np.fill_diagonal(self._CU[:n, :n], 1)
+            self._CU[n:, n:] = U
         self.qudits = 2
         self.num_inputs = 0
 
@@ -804,18 +859,19 @@ class CUGate(Gate):
     def assemble(self, v, i=0):
         gatename = self.gatename
         gateparams = self.gateparams
-        indices = (i, i+1) if not flipped else (i+1, i)
+        indices = (i, i+1) if not self.flipped else (i+1, i)
         return [("gate", gatename, gateparams, indices)]
 
     def __repr__(self):
-        return "CUGate(" + str(repr(self._U)) + ("" if self.name is None else ", name={}".format(repr(self.name))) + ("flipped=True" if self.flipped else "") + ")"
+        return "CUGate(" + repr(self._U) + ("" if self.gatename == "Name" else ", gatename={}".format(repr(self.gatename))) + ("" if self.gateparams == () else ", gateparams={}".format(repr(self.gateparams))) + (", flipped=True" if self.flipped else "") + ")"
 
 class CNOTRootGate(Gate):
     """Represents the sqrt(CNOT) gate.  Two sqrt(CNOT) gates in a row will form a CNOT gate."""
     _cnr = np.array([[1,0,0,0],
                        [0,1,0,0],
                        [0,0,0.5+0.5j,0.5-0.5j],
-                       [0,0,0.5-0.5j,0.5+0.5j]])
+                       [0,0,0.5-0.5j,0.5+0.5j]], dtype='complex128')
+
     def __init__(self):
         self.num_inputs = 0
         self.qudits = 2
@@ -831,6 +887,8 @@ class CNOTRootGate(Gate):
 
 class KroneckerGate(Gate):
     """Represents the Kronecker product of a list of gates.  This is equivalent to performing those gate in parallel in a quantum circuit."""
+    _constant = None # cached matrix for subgate lists with no parameters
+
     def __init__(self, *subgates):
         """
         Args:
@@ -839,47 +897,87 @@ class KroneckerGate(Gate):
         self.num_inputs = sum([gate.num_inputs for gate in subgates])
         self._subgates = subgates
         self.qudits = sum([gate.qudits for gate in subgates])
+        self._slices = _input_slices(subgates)
+        # the kronecker product of permutations (and identities) is itself a permutation
+        perm = np.zeros(1, dtype=np.intp)
+        for gate in subgates:
+            subperm = np.arange(gate._I.shape[0]) if isinstance(gate, IdentityGate) else gate._perm
+            if subperm is None:
+                break
+            perm = (perm[:, None] * len(subperm) + subperm[None, :]).ravel()
+        else:
+            self._perm = perm
 
     def matrix(self, v):
+        if self.num_inputs == 0:
+            if self._constant is None:
+                self._constant = self._matrix(v)
+            return self._constant
+        return self._matrix(v)
+
+    def _matrix(self, v):
         if len(self._subgates) < 2:
             return self._subgates[0].matrix(v)
-        matrices = []
-        index = 0
-        for gate in self._subgates:
-            U = gate.matrix(v[index:index+gate.num_inputs])
-            matrices.append(U)
-            index += gate.num_inputs
-        U = matrices[0]
-        for matrix in matrices[1:]:
-            U = np.kron(U, matrix)
+        # identities are expanded into diagonal blocks rather than multiplied in
+        U = None
+        lead = 1
+        for gate, inputs in zip(self._subgates, self._slices):
+            if isinstance(gate, IdentityGate):
+                k = gate._I.shape[0]
+                if U is None:
+                    lead *= k
+                else:
+                    U = _kron_eye(U, k)
+                continue
+            M = gate.matrix(v[inputs])
+            U = M if U is None else _kron(U, M)
+        if U is None:
+            return _identity(lead)
+        return U if lead == 1 else _eye_kron(lead, U)
+
+    def batch_matrix(self, V):
+        if self.num_inputs == 0:
+            return Gate.batch_matrix(self, V)
+        V = np.asarray(V)
+        U = None
+        for gate, inputs in zip(self._subgates, self._slices):
+            M = gate.batch_matrix(V[:, inputs])
+            U = M if U is None else (U[:, :, None, :, None] * M[:, None, :, None, :]).reshape(len(V), U.shape[1]*M.shape[1], U.shape[2]*M.shape[2])
         return U
 
     def mat_jac(self, v):
         if len(self._subgates) < 2:
             return self._subgates[0].mat_jac(v)
-        matjacs = []
-        index = 0
-        for gate in self._subgates:
-            MJ = gate.mat_jac(v[index:index+gate.num_inputs])
-            matjacs.append(MJ)
-            index += gate.num_inputs
-
+        # identities are expanded into diagonal blocks rather than multiplied in, as in matrix()
         U = None
         jacs = []
-        for M, Js in matjacs:
-            jacs = [np.kron(J, M) for J in jacs]
+        lead = 1
+        for gate, inputs in zip(self._subgates, self._slices):
+            if isinstance(gate, IdentityGate):
+                k = gate._I.shape[0]
+                if U is None:
+                    lead *= k
+                else:
+                    jacs = [_kron_eye(J, k) for J in jacs]
+                    U = _kron_eye(U, k)
+                continue
+            M, Js = gate.mat_jac(v[inputs])
+            jacs = [_kron(J, M) for J in jacs]
             for J in Js:
-                jacs.append(J if U is None else np.kron(U,J))
-            U = M if U is None else np.kron(U, M)
-
+                jacs.append(J if U is None else _kron(U, J))
+            U = M if U is None else _kron(U, M)
+
+        if U is None:
+            return (_identity(lead), [])
+        if lead > 1:
+            jacs = [_eye_kron(lead, J) for J in jacs]
+            U = _eye_kron(lead, U)
         return (U, jacs)
 
     def assemble(self, v, i=0):
         out = []
-        index = 0
-        for gate in self._subgates:
-            out += gate.assemble(v[index:index+gate.num_inputs], i)
-            index += gate.num_inputs
+        for gate, inputs in zip(self._subgates, self._slices):
+            out += gate.assemble(v[inputs], i)
             i += gate.qudits
         return [("block", out)]
 
@@ -898,6 +996,13 @@ class KroneckerGate(Gate):
     def __deepcopy__(self, memo):
         return KroneckerGate(self._subgates.__deepcopy__(memo))
 
+    def __reduce__(self):
+        return (KroneckerGate, tuple(self._subgates)) # cached matrices are not worth storing in checkpoints
+
+    def __setstate__(self, state):
+        # older pickles restore __dict__ directly, so rebuild the fields that __init__ derives from the subgates
+        self.__init__(*state['_subgates'])
+
     def __repr__(self):
         return "KroneckerGate({})".format(repr(self._subgates)[1:-1])
 
@@ -921,6 +1026,8 @@ class KroneckerGate(Gate):
 
 class ProductGate(Gate):
     """Represents a matrix product of Gates.  This is equivalent to performing those gates sequentially in a quantum circuit."""
+    _constant = None # cached matrix for subgate lists with no parameters
+
     def __init__(self, *subgates):
         """
         Args:
@@ -928,74 +1035,93 @@ class ProductGate(Gate):
         """
         self.num_inputs = sum([gate.num_inputs for gate in subgates])
         self._subgates = list(subgates)
+        self._slices = _input_slices(subgates)
+        self._factors = [gate for gate in subgates if not isinstance(gate, IdentityGate)] # identities contribute nothing to the product
+        self._factor_slices = _input_slices(self._factors)
         self.qudits = 0 if len(subgates) == 0 else subgates[0].qudits
 
     def matrix(self, v):
-        if len(self._subgates) < 2:
-            return self._subgates[0].matrix(v)
+        if self.num_inputs == 0:
+            if self._constant is None:
+                self._constant = self._matrix(v)
+            return self._constant
+        return self._matrix(v)
+
+    def _matrix(self, v):
+        if len(self._factors) < 2:
+            return (self._factors or self._subgates)[0].matrix(v)
         matrices = []
-        index = 0
-        for gate in self._subgates:
-            U = gate.matrix(v[index:index+gate.num_inputs])
-            matrices.append(U)
-            index += gate.num_inputs
-        U = matrices[0]
-        buffer1 = U.copy()
-        buffer2 = U.copy()
-        for matrix in matrices[1:]:
-            U = np.matmul(matrix, U, out=buffer1)
-            buffertmp = buffer2
-            buffer2 = buffer1
-            buffer1 = buffer2
+        for gate, inputs in zip(self._factors, self._factor_slices):
+            # permutations are applied by reindexing rather than by a matrix product
+            matrices.append(gate._perm if gate._perm is not None else gate.matrix(v[inputs]))
+        return self._product(matrices)
+
+    def _product(self, matrices):
+        """Multiplies out matrices in the order the subgates are applied.  One-dimensional entries are row permutations as described by Gate._perm."""
+        first = matrices[0]
+        if first.ndim == 1:
+            if matrices[1].ndim == 2:
+                # a leading permutation just reorders the columns of the rest of the product
+                rest = matrices[1] if len(matrices) == 2 else self._product(matrices[1:])
+                return rest[:, np.argsort(first)]
+            first = np.eye(len(first), dtype='complex128')[first]
+        # the subgates are applied in order, so the first gate is the rightmost factor
+        if len(matrices) == 2:
+            return first[matrices[1]] if matrices[1].ndim == 1 else np.matmul(matrices[1], first)
+        # intermediate products alternate between two buffers rather than allocating one per factor
+        # they are not kept on self, since every ProductGate in the search queue would otherwise hold on to them
+        buffers = (np.empty(first.shape, dtype='complex128', order='F'), np.empty(first.shape, dtype='complex128', order='F'))
+        A = first
+        for i, U in enumerate(matrices[1:-1]):
+            out = buffers[i % 2]
+            if U.ndim == 1:
+                A = np.take(A, U, axis=0, out=out, mode='clip')
+            else:
+                A = zgemm(1.0, U, A, c=out, overwrite_c=True)
+        return A[matrices[-1]] if matrices[-1].ndim == 1 else np.matmul(matrices[-1], A)
+
+    def batch_matrix(self, V):
+        if self.num_inputs == 0:
+            return Gate.batch_matrix(self, V)
+        if len(self._factors) < 2:
+            return self._factors[0].batch_matrix(V)
+        V = np.asarray(V)
+        U = None
+        for gate, inputs in zip(self._factors, self._factor_slices):
+            if U is not None and gate._perm is not None:
+                U = U[:, gate._perm]
+            else:
+                M = gate.batch_matrix(V[:, inputs])
+                U = M if U is None else np.matmul(M, U)
         return U
 
     def mat_jac(self, v):
-        if len(self._subgates) < 2:
-            return self._subgates[0].mat_jac(v)
+        if len(self._factors) < 2:
+            return (self._factors or self._subgates)[0].mat_jac(v)
         submats = []
         subjacs = []
-        index = 0
-        for gate in self._subgates:
-            U, Js = gate.mat_jac(v[index:index+gate.num_inputs])
-            submats.append(U)
+        for gate, inputs in zip(self._factors, self._factor_slices):
+            U, Js = gate.mat_jac(v[inputs])
+            submats.append(U if gate._perm is None else gate._perm)
             subjacs.append(Js)
-            index += gate.num_inputs
         
-        B = np.eye(submats[0].shape[0], dtype='complex128')
-        A = submats[0]
+        B = np.eye(len(submats[0]), dtype='complex128')
+        A = self._product(submats)
         jacs = []
-        ba1 = A.copy()
-        ba2 = A
-        bb1 = B.copy()
-        bb2 = B
-        bj = B.copy()
-        for matrix in submats[1:]:
-            A = np.matmul(matrix, A, out=ba1)
-            buffertmp = ba2
-            ba2 = ba1
-            ba1 = ba2
-
         for i, Js in enumerate(subjacs):
-            A = np.matmul(A, submats[i].T.conjugate(), out=ba1) # remove the current matrix from the "after" array
-            for J in Js:
-                tmp = np.matmul(J, B, out=bj)
-                jacs.append(np.matmul(A, tmp, out=J))
-            B = np.matmul(submats[i], B, out=bb1) # add the current matrix to the "before" array before progressing
-            buffertmp = ba1
-            ba1 = ba2
-            ba2 = buffertmp
-            buffertmp = bb1
-            bb1 = bb2
-            bb2 = buffertmp
+            # remove the current matrix from the "after" array; the inverse of a permutation is just a column reindex
+            A = A[:, submats[i]] if submats[i].ndim == 1 else np.matmul(A, submats[i].T.conjugate())
+            if len(Js) > 0:
+                # every jacobian of this subgate is sandwiched between the same two matrices, so do them as one stacked matmul
+                jacs.extend(np.matmul(A, np.matmul(np.asarray(Js), B)))
+            B = B[submats[i]] if submats[i].ndim == 1 else np.matmul(submats[i], B) # add the current matrix to the "before" array before progressing
             
         return (B, jacs)
 
     def assemble(self, v, i=0):
         out = []
-        index = 0
-        for gate in self._subgates:
-            out += gate.assemble(v[index:index+gate.num_inputs], i)
-            index += gate.num_inputs
+        for gate, inputs in zip(self._subgates, self._slices):
+            out += gate.assemble(v[inputs], i)
         return out
 
     def appending(self, *gates):
@@ -1018,6 +1144,13 @@ class ProductGate(Gate):
     def __deepcopy__(self, memo):
         return ProductGate(self._subgates.__deepcopy__(memo))
 
+    def __reduce__(self):
+        return (ProductGate, tuple(self._subgates)) # cached matrices and _factors are rebuilt by __init__
+
+    def __setstate__(self, state):
+        # older pickles restore __dict__ directly, so rebuild the fields that __init__ derives from the subgates
+        self.__init__(*state['_subgates'])
+
     def __repr__(self):
         return "ProductGate({})".format(repr(self._subgates)[1:-1])
 
@@ -19,7 +19,6 @@ Attributes:
 """
 from .gates import *
 from .assemblers import flatten_intermediate
-import numpy as np
 
 
 
@@ -84,7 +83,7 @@ class Gateset():
         # NOTE: it is safe to assume that the circuit passed in here was produced by the functions of this class
         
         # This is the default implementation, for Gatesets that rely on search_layers
-        qudits = int(np.log(circ.matrix([0]*circ.num_inputs).shape[0])/np.log(self.d))
+        qudits = circ.qudits
         return [(circ.appending(t[0]), t[1]) for t in self.search_layers(qudits)]
 
     def __eq__(self, other):
@@ -141,7 +140,7 @@ class QubitCNOTLinear(Gateset):
 
     def successors(self, circ, qudits=None):
         if qudits is None:
-            qudits = int(np.log(circ.matrix([0]*circ.num_inputs).shape[0])/np.log(self.d))
+            qudits = circ.qudits
         skip_index = find_last_3_cnots_linear(circ)
         return [(circ.appending(layer[0]), layer[1]) for layer in linear_topology(self.cnot, self.single_gate, qudits, self.d, single_alt=self.single_alt, skip_index=skip_index)]
 
@@ -183,7 +182,7 @@ class QubitCZLinear(Gateset):
 
     def successors(self, circ, qudits=None):
         if qudits is None:
-            qudits = int(np.log(circ.matrix([0]*circ.num_inputs).shape[0])/np.log(self.d))
+            qudits = circ.qudits
         skip_index = find_last_3_cnots_linear(circ)
         return [(circ.appending(layer[0]), layer[1]) for layer in linear_topology(self.two_gate, self.single_gate, qudits, self.d, single_alt=self.single_alt, skip_index=skip_index)]
 
@@ -206,7 +205,7 @@ class QubitISwapLinear(Gateset):
 
     def successors(self, circ, qudits=None):
         if qudits is None:
-            qudits = int(np.log(circ.matrix([0]*circ.num_inputs).shape[0])/np.log(self.d))
+            qudits = circ.qudits
         skip_index = find_last_3_cnots_linear(circ)
         return [(circ.appending(layer[0]), layer[1]) for layer in linear_topology(self.two_gate, self.single_gate, qudits, self.d, single_alt=self.single_alt, skip_index=skip_index)]
 
@@ -229,7 +228,7 @@ class QubitXXLinear(Gateset):
 
     def successors(self, circ, qudits=None):
         if qudits is None:
-            qudits = int(np.log(circ.matrix([0]*circ.num_inputs).shape[0])/np.log(self.d))
+            qudits = circ.qudits
         skip_index = find_last_3_cnots_linear(circ)
         return [(circ.appending(layer[0]), layer[1]) for layer in linear_topology(self.two_gate, self.single_gate, qudits, self.d, single_alt=self.single_alt, skip_index=skip_index)]
 
@@ -39,10 +39,12 @@ class LeapCompiler(Compiler):
         beams : The number of nodes to pop from the search tree at a time.  The default value of -1 will create enough branches to maximize utilization of your CPU.
         error_func : The function that the Solver will attempt to minimize.
         eval_func : The function used by the heuristic in order to guide the search tree.  By default this is equal to error_func.
+        eval_target : The unitary that eval_func compares solved circuits against.  By default this is target after it is passed through unitary_preprocessor.
         error_jac : A function that returns a tuple of the value that error_func would generate and the jacobian of error_func
         error_residuals : A function that returns an array of real-valued residuals to be used by a least-squares-based Solver.
         error_residuals_jac : A function that returns the jacobian of error_residuals (note that it does NOT return a tuple of the residuals and the jacobian).
         timeout : An uper limit on the amount of time the compiler will spend trying to synthesize a circuit.  The default is float('inf'), for unlimited.
+        max_queue : An upper limit on the number of nodes kept in the search tree's frontier.  After each layer only the best max_queue nodes are kept.  The default is None for unlimited.
         checkpoint : The compiler will use this Checkpoint to save intermediate state, and will resume from this Checkpoint if there was an existing state.
         logger : A qsearch.logging.Logger that will be used for logging the synthesis process.
         min_depth : the minimum amount of searching 
@@ -68,7 +70,7 @@ class LeapCompiler(Compiler):
         options = self.options.updated(options)
         options.make_required("target")
 
-        U = options.unitary_preprocessor(options.target)
+        U = options.eval_target
         depth = options.weight_limit
 
         child_checkpoint = ChildCheckpoint(Options(parent=options.checkpoint))
@@ -77,7 +79,7 @@ class LeapCompiler(Compiler):
 
         starttime = timer() # note, because all of this setup gets included in the total time, stopping and restarting the project may lead to time durations that are not representative of the runtime under normal conditions
         rectime = 0
-        qudits = int(np.round(np.log(np.shape(U)[0])/np.log(options.gateset.d)))
+        qudits = utils.num_qudits(np.shape(U)[0], options.gateset.d)
 
         sub_compiler = options.sub_compiler_class if 'sub_compiler_class' in options else SubCompiler
         sc = sub_compiler(options)
@@ -123,8 +125,7 @@ class SubCompiler(Compiler):
         options = self.options.updated(options)
         options.make_required("target")
 
-        if "unitary_preprocessor" in options:
-            U = options.unitary_preprocessor(options.target)
+        U = options.eval_target
         depth = options.weight_limit
         checkpoint = options.checkpoint
 
@@ -132,7 +133,7 @@ class SubCompiler(Compiler):
 
         starttime = timer() # note, because all of this setup gets included in the total time, stopping and restarting the project may lead to time durations that are not representative of the runtime under normal conditions
         h = options.heuristic
-        qudits = int(np.round(np.log(np.shape(U)[0])/np.log(options.gateset.d)))
+        qudits = utils.num_qudits(np.shape(U)[0], options.gateset.d)
 
         if options.gateset.d**qudits != np.shape(U)[0]:
             raise ValueError("The target matrix of size {} is not compatible with qudits of size {}.".format(np.shape(U)[0], self.options.gateset.d))
@@ -189,6 +190,7 @@ class SubCompiler(Compiler):
             queue, best_depth, best_value, best_pair, tiebreaker, rectime = recovered_state
             logger.logprint("Recovered state with best result {} at depth {}".format(best_value, best_depth))
 
+        max_queue = options.max_queue if 'max_queue' in options else None
         options.generate_cache() # cache the results of smart_default settings, such as the default solver, before entering the main loop where the options will get pickled and the smart_default functions called many times because later caching won't persist cause of pickeling and multiple processes
         previous_bests_depths = []
         previous_bests_values = []
@@ -209,12 +211,11 @@ class SubCompiler(Compiler):
 
                 then = timer()
                 new_steps = [(current_tup[5].appending(search_layer[0]), current_tup[1], search_layer[1]) for search_layer in search_layers for current_tup in popped]
-                for step, result, current_depth, weight in parallel.solve_circuits_parallel(new_steps):
-                    current_value = options.eval_func(U, result[0])
+                for step, parameters, current_value, current_depth, weight in parallel.solve_circuits_parallel(new_steps):
                     new_depth = current_depth + weight
                     if (current_value < best_value and (best_value >= options.threshold or new_depth <= best_depth)) or (current_value < options.threshold and new_depth < best_depth):
                         best_value = current_value
-                        best_pair = (step, result[1])
+                        best_pair = (step, parameters)
                         best_depth = new_depth
                         logger.logprint("New best! score: {} at depth: {}".format(best_value, new_depth))
                         if len(previous_bests_values) > 1:
@@ -230,8 +231,10 @@ class SubCompiler(Compiler):
                         previous_bests_values.append(best_value)
 
                     if depth is None or new_depth < depth:
-                        heapq.heappush(queue, (h(step, result[1], new_depth, options), new_depth, current_value, tiebreaker, result[1], step))
+                        heapq.heappush(queue, (h(step, parameters, new_depth, options), new_depth, current_value, tiebreaker, parameters, step))
                         tiebreaker+=1
+                if max_queue is not None and len(queue) > max_queue:
+                    queue = heapq.nsmallest(max_queue, queue) # a sorted list is still a valid heap
                 logger.logprint("Layer completed after {} seconds".format(timer() - then), verbosity=2)
                 checkpoint.save((queue, best_depth, best_value, best_pair, tiebreaker, rectime+(timer()-starttime)))
         finally:
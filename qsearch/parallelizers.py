@@ -33,18 +33,39 @@ def default_num_tasks(options):
 
 def evaluate_step(tup, options):
     step, depth, weight = tup
-    return (step, options.solver.solve_for_unitary(options.backend.prepare_circuit(step, options), options), depth, weight)
+    result = options.solver.solve_for_unitary(options.backend.prepare_circuit(step, options), options)
+    # evaluate here rather than sending the solved unitary back to the main process
+    return (step, result[1], options.eval_func(options.eval_target, result[0]), depth, weight)
 
 def single_task(opts):
     return 1
 
-def process_initializer():
+def chunk_size(tuples, num_tasks):
+    """Returns how many of tuples to send to a worker at once, so that each worker still gets several chunks to balance the load."""
+    return max(1, len(tuples) // (4 * num_tasks))
+
+# the Options used by evaluate_worker_step, installed once per worker process by process_initializer
+_worker_options = None
+
+def evaluate_worker_step(tup):
+    return evaluate_step(tup, _worker_options)
+
+def process_initializer(options=None):
+    global _worker_options
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_options = options
 
 class Parallelizer():
     """Base class for all Parallelizers. Parallelizers calculate the value of multiple search nodes in parallel."""
     def solve_circuits_parallel(self, tuples):
-        """Calculate the value of search tree nodes in parallel."""
+        """Calculate the value of search tree nodes in parallel.
+
+        Args:
+            tuples : A list of tuples of (step, depth, weight) for the search tree nodes to be solved.
+
+        Returns:
+            iterable : Tuples of (step, parameters, value, depth, weight), where parameters are the solved parameters for step and value is the eval_func value of the solved circuit.
+        """
         return None
 
     def done(self):
@@ -58,11 +79,14 @@ class LokyParallelizer(Parallelizer):
     """
     def __init__(self, options):
         options.set_smart_defaults(num_tasks=default_num_tasks)
+        # unlike the other process-based parallelizers, loky ships the options (target included) with every chunk of tasks rather than
+        # installing them once per worker: passing them as initargs would stop get_reusable_executor from reusing its workers
         self.executor = get_reusable_executor(max_workers=options.num_tasks)
+        self.num_tasks = options.num_tasks
         self.process_func = partial(evaluate_step, options=options)
 
     def solve_circuits_parallel(self, tuples):
-        return self.executor.map(self.process_func, tuples)
+        return self.executor.map(self.process_func, tuples, chunksize=chunk_size(tuples, self.num_tasks))
 
 class MultiprocessingParallelizer(Parallelizer):
     """A Parallelizer based on muliprocessing. Note this cannot be used with the MultiStart_Solvers!"""
@@ -72,11 +96,12 @@ class MultiprocessingParallelizer(Parallelizer):
         else:
             ctx = get_context()
         options.set_smart_defaults(num_tasks=default_num_tasks)
-        self.pool = ctx.Pool(options.num_tasks, initializer=process_initializer)
-        self.process_func = partial(evaluate_step, options=options)
+        self.pool = ctx.Pool(options.num_tasks, initializer=process_initializer, initargs=(options,))
+        self.num_tasks = options.num_tasks
+        self.process_func = evaluate_worker_step
 
     def solve_circuits_parallel(self, tuples):
-        yield from self.pool.imap_unordered(self.process_func, tuples)
+        yield from self.pool.imap_unordered(self.process_func, tuples, chunksize=chunk_size(tuples, self.num_tasks))
 
     def done(self):
         self.pool.close()
@@ -89,14 +114,15 @@ class ProcessPoolParallelizer(Parallelizer):
         options.set_smart_defaults(num_tasks=default_num_tasks)
         if sys.version_info >= (3, 8, 0) and sys.platform != 'win32':
             ctx = get_context('fork')
-            self.pool = ProcessPoolExecutor(options.num_tasks, mp_context=ctx, initializer=process_initializer)
+            self.pool = ProcessPoolExecutor(options.num_tasks, mp_context=ctx, initializer=process_initializer, initargs=(options,))
         else:
-            self.pool = ProcessPoolExecutor(options.num_tasks, initializer=process_initializer)
+            self.pool = ProcessPoolExecutor(options.num_tasks, initializer=process_initializer, initargs=(options,))
 
-        self.process_func = partial(evaluate_step, options=options)
+        self.num_tasks = options.num_tasks
+        self.process_func = evaluate_worker_step
 
     def solve_circuits_parallel(self, tuples):
-        return self.pool.map(self.process_func, tuples)
+        return self.pool.map(self.process_func, tuples, chunksize=chunk_size(tuples, self.num_tasks))
 
     def done(self):
         self.pool.shutdown()
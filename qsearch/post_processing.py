@@ -49,10 +49,7 @@ class BasicSingleQubitReduction_PostProcessor(PostProcessor):
         circuit = result["structure"]
         finalx = result["parameters"]
         options = self.options.updated(options)
-        if "unitary_preprocessor" in options:
-            target = options.unitary_preprocessor(options.target)
-        else:
-            target = options.target
+        target = options.eval_target
         single_qubit_names = ["U3Gate()", "ZXZXZGate()", "XZXZGate()"]
         identitystr = "IdentityGate()"
 
@@ -87,10 +84,7 @@ class ParameterTuning_PostProcessor(PostProcessor):
         initialx = result["parameters"]
         options = self.options.updated(options)
         options.max_quality_optimization = True
-        if "unitary_preprocessor" in options:
-            target = options.unitary_preprocessor(options.target)
-        else:
-            target = options.target
+        target = options.eval_target
         initial_value = options.eval_func(target, circuit.matrix(initialx))
         options.logger.logprint("Initial Distance: {}".format(initial_value))
 
@@ -136,15 +130,14 @@ class LEAPReoptimizing_PostProcessor(Compiler, PostProcessor):
         options = self.options.updated(options)
         options.make_required("target")
 
-        if "unitary_preprocessor" in options:
-            U = options.unitary_preprocessor(options.target)
+        U = options.eval_target
         depth = options.weight_limit if 'weight_limit' in options else options.reoptimize_size
         child_checkpoint = ChildCheckpoint(Options(parent=options.checkpoint))
 
         logger = options.logger if "logger" in options else logging.Logger(verbosity=options.verbosity, stdout_enabled=options.stdout_enabled, output_file=options.log_file)
 
         overall_startime = timer() # note, because all of this setup gets included in the total time, stopping and restarting the project may lead to time durations that are not representative of the runtime under normal conditions
-        qudits = int(np.round(np.log(np.shape(U)[0])/np.log(options.gateset.d)))
+        qudits = utils.num_qudits(np.shape(U)[0], options.gateset.d)
 
         parallel = options.parallelizer(options)
         recovered_outer = child_checkpoint.recover_parent()
@@ -176,7 +169,7 @@ class LEAPReoptimizing_PostProcessor(Compiler, PostProcessor):
                     window_size = depth or options.reoptimize_size
                     root = ProductGate(*best_circuit._subgates[:point], *best_circuit._subgates[point + window_size:])
                     h = options.heuristic
-                    qudits = int(np.round(np.log(np.shape(U)[0])/np.log(options.gateset.d)))
+                    qudits = utils.num_qudits(np.shape(U)[0], options.gateset.d)
 
                     if options.gateset.d**qudits != np.shape(U)[0]:
                         raise ValueError("The target matrix of size {} is not compatible with qudits of size {}.".format(np.shape(U)[0], self.options.gateset.d))
@@ -245,16 +238,15 @@ class LEAPReoptimizing_PostProcessor(Compiler, PostProcessor):
 
                         then = timer()
                         new_steps = [(current_tup[5].inserting(search_layer[0], depth=point), current_tup[1], search_layer[1]) for search_layer in search_layers for current_tup in popped]
-                        for step, result, current_depth, weight in parallel.solve_circuits_parallel(new_steps):
-                            current_value = options.eval_func(U, result[0])
+                        for step, parameters, current_value, current_depth, weight in parallel.solve_circuits_parallel(new_steps):
                             new_depth = current_depth + weight
                             if (current_value < best_value and (best_value >= options.threshold or new_depth <= best_depth)) or (current_value < options.threshold and new_depth < best_depth):
                                 best_value = current_value
-                                best_pair = (step, result[1])
+                                best_pair = (step, parameters)
                                 best_depth = new_depth
                                 logger.logprint("New best! score: {} at depth: {}".format(best_value, new_depth))
                             if depth is None or new_depth < depth - 1:
-                                heapq.heappush(queue, (h(step, result[1], new_depth, options), new_depth, current_value, tiebreaker, result[1], step))
+                                heapq.heappush(queue, (h(step, parameters, new_depth, options), new_depth, current_value, tiebreaker, parameters, step))
                                 tiebreaker+=1
                         logger.logprint("Layer completed after {} seconds".format(timer() - then), verbosity=2)
                         if (options.weight_limit is not None and best_depth >= options.weight_limit - 1) or ('reoptimize_size' in options and best_depth >= options.reoptimize_size - 1):
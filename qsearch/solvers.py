@@ -26,7 +26,7 @@ def default_solver(options, x0=None):
 
     # check if Rust works on the layers
     gateset = options.gateset
-    qudits = 0 if "target" not in options else int(np.log(options.target.shape[0]) // np.log(gateset.d))
+    qudits = 0 if "target" not in options else utils.num_qudits(options.target.shape[0], gateset.d)
     layers = [(gateset.initial_layer(qudits), 0)] + gateset.search_layers(qudits)
 
     rs_failed = True
@@ -107,16 +107,21 @@ class CMA_Solver(Solver):
         except ImportError:
             print("ERROR: Could not find cma, try running pip install quantum_synthesis[cma]", file=sys.stderr)
             sys.exit(1)
-        eval_func = lambda v: options.error_func(options.target, circuit.matrix(v))
-        initial_guess = 'np.random.rand({})*2*np.pi'.format(circuit.num_inputs) if x0 is None else x0
-        xopt, _ = cma.fmin2(eval_func, initial_guess, 0.25, {'verb_disp':0, 'verb_log':0, 'bounds' : [0,2*np.pi]}, restarts=2)
+        initial_guess = np.random.rand(circuit.num_inputs)*2*np.pi if x0 is None else x0
+        if hasattr(circuit, "batch_matrix"):
+            # evaluate each generation of candidates together rather than building their matrices one at a time
+            batch_eval_func = lambda X: [options.error_func(options.target, U) for U in circuit.batch_matrix(np.array(X))]
+            xopt, _ = cma.fmin2(None, initial_guess, 0.25, {'verb_disp':0, 'verb_log':0, 'bounds' : [0,2*np.pi]}, restarts=2, parallel_objective=batch_eval_func)
+        else:
+            eval_func = lambda v: options.error_func(options.target, circuit.matrix(v))
+            xopt, _ = cma.fmin2(eval_func, initial_guess, 0.25, {'verb_disp':0, 'verb_log':0, 'bounds' : [0,2*np.pi]}, restarts=2)
         return (circuit.matrix(xopt), xopt)
 
 class COBYLA_Solver(Solver):
     """Uses cobyla gradient-free optimization from scipy."""
     def solve_for_unitary(self, circuit, options, x0=None):
         eval_func = lambda v: options.error_func(options.target, circuit.matrix(v))
-        initial_guess = np.array(np.random.rand(circuit.num_inputs))*2*np.pi if x0 is None else x0
+        initial_guess = np.random.rand(circuit.num_inputs)*2*np.pi if x0 is None else x0
         x = sp.optimize.fmin_cobyla(eval_func, initial_guess, cons=[lambda x: np.all(np.less_equal(x,2*np.pi))], rhobeg=0.5, rhoend=1e-12, maxfun=1000*circuit.num_inputs)
         return (circuit.matrix(x), x)
 
@@ -128,7 +133,7 @@ class DIY_Solver(Solver):
 
     def solve_for_unitary(self, circuit, options, x0=None):
         eval_func = lambda v: options.error_func(options.target, circuit.matrix(v))
-        initial_guess = np.array(np.random.rand(circuit.num_inputs))*2*np.pi if x0 is None else x0
+        initial_guess = np.random.rand(circuit.num_inputs)*2*np.pi if x0 is None else x0
         x = f(eval_func, initial_guess)
 
 class NM_Solver(Solver):
@@ -149,7 +154,7 @@ class CMA_Jac_Solver(Solver):
             sys.exit(1)
         eval_func = lambda v: options.error_func(options.target, circuit.matrix(v))
         jac_func  = lambda v: options.error_jac(options.target, circuit.mat_jac(v))
-        initial_guess = 'np.random.rand({})'.format(circuit.num_inputs)*2*np.pi if x0 is None else x0
+        initial_guess = np.random.rand(circuit.num_inputs)*2*np.pi if x0 is None else x0
         xopt, es = cma.fmin2(eval_func, initial_guess, 0.25, {'verb_disp':0, 'verb_log':0, 'bounds' : [0,2*np.pi]}, restarts=2, gradf=jac_func)
         if circuit.num_inputs > 18:
             raise Warning("Finished with {} evaluations".format(es.result[3]))
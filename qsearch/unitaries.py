@@ -123,15 +123,18 @@ def rot_y_jac(theta: float):
 
 def qft(n: int):
     root = np.e ** (2j * np.pi / n)
-    Q = np.array(np.fromfunction(lambda x,y: root**(x*y), (n,n))) / np.sqrt(n)
+    Q = np.fromfunction(lambda x,y: root**(x*y), (n,n)) / np.sqrt(n)
     return Q
 
 def identity(n: int): # not super necessary but saves a little code length
-    return np.array(np.eye(n), dtype='complex128')
+    return np.eye(n, dtype='complex128')
 
 def general_swap(d: int = 2): # generates the swap matrix for qu-qudits
-    f = lambda i, j: (i % d == j//d) and (i // d == j % d)
-    return np.array(np.fromfunction(np.vectorize(f), (d**2, d**2)), dtype='complex128')
+    # basis state i = a*d + b is sent to b*d + a, so swap the two digits of each index
+    idx = np.arange(d**2)
+    S = np.zeros((d**2, d**2), dtype='complex128')
+    S[idx, (idx % d) * d + idx // d] = 1
+    return S
 
 # generates an arbitrary cnot gate by classical logic and brute force
 # it may be a good idea to write a better version of this at some point, but this should be good enough for use with the search compiler on 2-4 qubits.
@@ -12,6 +12,8 @@ Attributes:
     remap : Remaps a unitary for acting on qudits in a different order.
     upgrade_qudits : Upgrades a unitary from a lower qudit size to a larger qudit size.
 """
+import math
+
 import numpy as np
 import scipy as sp
 import scipy.linalg
@@ -21,11 +23,13 @@ try:
 except ImportError:
     MPI = None
 
-from . import unitaries
+def num_qudits(size, d=2):
+    """Returns the number of qudits of size d described by a vector or matrix dimension of size, rounded to the nearest integer rather than truncated."""
+    return int(round(math.log(size, d)))
 
 def matrix_product(*LU):
     """Performs matrix multiplication of a list of matrices."""
-    result = np.array(np.eye(LU[0].shape[0]), dtype='complex128')
+    result = np.eye(LU[0].shape[0], dtype='complex128')
     for U in LU:
         result = np.matmul(U, result, out=result)
     return result
@@ -43,16 +47,15 @@ def op_norm(A):
 
 def matrix_distance_squared(A,B):
     # this distance function is designed to be phase agnostic
-    # optimized implementation
-    return np.abs(1 - np.abs(np.sum(np.multiply(A,np.conj(B)))) / A.shape[0])
+    # optimized implementation, np.vdot conjugates B while taking the dot product so no elementwise intermediate is allocated
+    return np.abs(1 - np.abs(np.vdot(B, A)) / A.shape[0])
     #original implementation
     #return 1 - np.abs(np.trace(np.dot(A,B.T.conjugate()))) / A.shape[0]
 
 def matrix_distance_squared_jac(U, M, J):
-    S = np.sum(np.multiply(U, np.conj(M)))
+    S = np.vdot(M, U)
     dsq = 1 - np.abs(S)/U.shape[0]
-    JU = np.array([np.multiply(U,np.conj(K)) for K in J])
-    JUS = np.sum(JU, axis=(1,2))
+    JUS = np.array([np.vdot(K, U) for K in J])
     jacs = -(np.real(S)*np.real(JUS) + np.imag(S)*np.imag(JUS))*U.shape[0] / np.abs(S)
     return (dsq, jacs)
 
@@ -158,7 +161,7 @@ def nearest_unitary(A):
             raise TypeError("A must be a square matrix.")
 
         V, __, Wh = sp.linalg.svd(A)
-        U = np.array(V.dot(Wh))
+        U = V.dot(Wh)
         return U
     except Exception:
         return A
@@ -189,7 +192,7 @@ def downgrade_qudits_residuals_jac(di, df, A, B, J):
     return JU.T
 
 def eval_func_from_residuals(f, A, B):
-    return np.sum(np.square(f(A,B,I=np.array(np.eye(A.shape[0]), dtype='float64'))))
+    return np.sum(np.square(f(A,B,I=np.eye(A.shape[0], dtype='float64'))))
 
 def generate_stateprep_target_matrix(state):
     # WARNING: the matrix generated by this function (currently) is not unitary, and therefore should only be used with functions like matrix_residuals_slice
@@ -260,46 +263,20 @@ def random_near_identity(n, alpha):
     H = np.array((np.random.rand(n,n) - 0.5) +1j * (np.random.rand(n,n) - 0.5))
     H = H + H.T.conjugate()
     # generate a unitary matrix from the hermitian matrix that is not far from the identity
-    return np.array(sp.linalg.expm(1j * H * alpha))
+    return sp.linalg.expm(1j * H * alpha)
     
 def remap(U, order, d=2):
     U = np.array(U, dtype='complex128')
-
-    swap = unitaries.general_swap(d)
-    qudits = int(np.round(np.log(np.shape(U)[0]) / np.log(d)))
-    beforemat = np.array(np.eye(np.shape(U)[0]), dtype='complex128')
-    aftermat  = np.array(np.eye(np.shape(U)[0]), dtype='complex128')
-    I = np.array(np.eye(d), dtype = 'complex128')
+    qudits = num_qudits(np.shape(U)[0], d)
     if qudits == 1:
         return U
-    current_order = [i for i in range(0, qudits)]
-    for i in range(0, qudits):
-        if not order[i] == current_order[i]:
-            target_loc = i
-            current_loc = current_order.index(order[i])
-            while not target_loc == current_loc:
-                if current_loc > target_loc:
-                    # perform the swap current_loc and current_loc - 1
-                    swapmat = matrix_kron(*[I]*(current_loc-1), swap, *[I]*(qudits - current_loc - 1))
-#                    print("I"*(current_loc-1) + "SS" + "I" *(qudits - current_loc - 1))
-                    current_order[current_loc], current_order[current_loc - 1] = current_order[current_loc - 1], current_order[current_loc]
-                    beforemat = np.dot(beforemat, swapmat)
-                    aftermat  = np.dot(swapmat, aftermat)
-                    current_loc = current_loc - 1
-                else:
-                    # perform the swap current_loc and current_loc + 1
-                    swapmat = matrix_kron(*[I]*(current_loc), swap, *[I]*(qudits - current_loc - 2))
- #                   print("I"*(current_loc) + "SS" + "I" *(qudits - current_loc - 2))
-                    current_order[current_loc], current_order[current_loc + 1] = current_order[current_loc + 1], current_order[current_loc]
-                    beforemat = np.dot(beforemat, swapmat)
-                    aftermat  = np.dot(swapmat, aftermat)
-                    current_loc = current_loc + 1
-
-    return matrix_product(beforemat, U, aftermat)
+    # reordering qudits is a permutation of the tensor axes of U, so there is no need to build swap matrices
+    axes = [*order, *[i + qudits for i in order]]
+    return U.reshape((d,)*(2*qudits)).transpose(axes).reshape(U.shape)
 
 def upgrade_qudits(U, di=2, df=3):
-    qudits = int(np.log(U.shape[0])/np.log(di))
-    new_unitary = np.array(np.eye(df**qudits), dtype='complex128')
+    qudits = num_qudits(U.shape[0], di)
+    new_unitary = np.eye(df**qudits, dtype='complex128')
     for i in range(df**qudits):
         skip = False
         testi = i
@@ -335,7 +312,7 @@ def endian_reverse(U, d=2):
     if len(U.shape) < 2:
         is_vector = True
         U = np.diag(U)
-    n = int(np.log(U.shape[0])/np.log(d))
+    n = num_qudits(U.shape[0], d)
     U = remap(U, list(reversed(range(0, n))), d)
     if is_vector:
         U = np.diag(U)
@@ -0,0 +1,178 @@
+import numpy as np
+from qsearch.gates import *
+from qsearch import unitaries
+
+import pytest
+
+u = U3Gate()
+xzxz = XZXZGate()
+cnot = CNOTGate()
+
+def reference_product(gate, v):
+    U = np.eye(2**gate.qudits, dtype='complex128')
+    index = 0
+    for subgate in gate._subgates:
+        U = np.dot(subgate.matrix(v[index:index+subgate.num_inputs]), U)
+        index += subgate.num_inputs
+    return U
+
+PRODUCT_GATES = (
+    ProductGate(u, xzxz),
+    ProductGate(u, xzxz, u),
+    ProductGate(IdentityGate(), u, IdentityGate(), xzxz),
+    ProductGate(IdentityGate(), u),
+    ProductGate(KroneckerGate(u, u), cnot, KroneckerGate(xzxz, u), cnot, KroneckerGate(u, xzxz)),
+    ProductGate(cnot, KroneckerGate(u, xzxz)),
+    ProductGate(KroneckerGate(u, xzxz), cnot),
+    ProductGate(cnot, cnot, KroneckerGate(u, xzxz), cnot, KroneckerGate(xzxz, u), cnot),
+    ProductGate(KroneckerGate(cnot, IdentityGate()), KroneckerGate(u, u, xzxz), KroneckerGate(IdentityGate(), cnot)),
+    ProductGate(KroneckerGate(u, xzxz, u), NonadjacentCNOTGate(3, 2, 0), KroneckerGate(xzxz, u, u)),
+)
+
+@pytest.mark.parametrize("gate", PRODUCT_GATES, ids=lambda gate: repr(gate))
+def test_product_matrix(gate):
+    v = np.random.rand(gate.num_inputs) * 2 * np.pi
+    assert np.allclose(gate.matrix(v), reference_product(gate, v))
+
+@pytest.mark.parametrize("gate", PRODUCT_GATES, ids=lambda gate: repr(gate))
+def test_product_mat_jac(gate):
+    v = np.random.rand(gate.num_inputs) * 2 * np.pi
+    U, jacs = gate.mat_jac(v)
+    assert np.allclose(U, reference_product(gate, v))
+    assert len(jacs) == gate.num_inputs
+    eps = 1e-7
+    for i, J in enumerate(jacs):
+        dv = np.zeros(gate.num_inputs)
+        dv[i] = eps
+        assert np.allclose(J, (reference_product(gate, v + dv) - reference_product(gate, v - dv)) / (2 * eps), atol=1e-6)
+
+KRONECKER_GATES = (
+    KroneckerGate(u, xzxz),
+    KroneckerGate(u, cnot, xzxz),
+    KroneckerGate(IdentityGate(), ProductGate(cnot, KroneckerGate(xzxz, u)), IdentityGate()),
+    KroneckerGate(u, IdentityGate(qudits=2), xzxz),
+    KroneckerGate(IdentityGate(), IdentityGate()),
+)
+
+@pytest.mark.parametrize("gate", KRONECKER_GATES, ids=lambda gate: repr(gate))
+def test_kronecker_matrix(gate):
+    v = np.random.rand(gate.num_inputs) * 2 * np.pi
+    U = np.eye(1, dtype='complex128')
+    index = 0
+    for subgate in gate._subgates:
+        U = np.kron(U, subgate.matrix(v[index:index+subgate.num_inputs]))
+        index += subgate.num_inputs
+    assert np.allclose(gate.matrix(v), U)
+
+@pytest.mark.parametrize("gate", KRONECKER_GATES, ids=lambda gate: repr(gate))
+def test_kronecker_mat_jac(gate):
+    v = np.random.rand(gate.num_inputs) * 2 * np.pi
+    matjacs = []
+    index = 0
+    for subgate in gate._subgates:
+        matjacs.append(subgate.mat_jac(v[index:index+subgate.num_inputs]))
+        index += subgate.num_inputs
+    expected = []
+    for i, (_, Js) in enumerate(matjacs):
+        for J in Js:
+            K = np.eye(1, dtype='complex128')
+            for j, (M, _) in enumerate(matjacs):
+                K = np.kron(K, J if i == j else M)
+            expected.append(K)
+    U, jacs = gate.mat_jac(v)
+    assert np.allclose(U, gate.matrix(v))
+    assert len(jacs) == len(expected)
+    for J, K in zip(jacs, expected):
+        assert np.allclose(J, K)
+
+def test_product_mat_jac_skips_identity():
+    gate = ProductGate(IdentityGate(qudits=2), KroneckerGate(u, xzxz), cnot, IdentityGate(qudits=2), KroneckerGate(xzxz, u))
+    reference = ProductGate(KroneckerGate(u, xzxz), cnot, KroneckerGate(xzxz, u))
+    v = np.random.rand(gate.num_inputs) * 2 * np.pi
+    U, jacs = gate.mat_jac(v)
+    U_ref, jacs_ref = reference.mat_jac(v)
+    assert np.allclose(U, U_ref)
+    assert np.allclose(jacs, jacs_ref)
+
+def test_constant_matrix_cached():
+    gate = ProductGate(KroneckerGate(cnot, IdentityGate()), KroneckerGate(IdentityGate(), cnot))
+    U = gate.matrix([])
+    assert gate.matrix([]) is U
+    assert np.allclose(U, reference_product(gate, []))
+
+def test_zxzxz_matrix():
+    gate = ZXZXZGate()
+    x90 = unitaries.rot_x(np.pi/2)
+    for _ in range(10):
+        v = np.random.rand(3) * 2 * np.pi
+        U = np.linalg.multi_dot([unitaries.rot_z(v[2]), x90, unitaries.rot_z(v[1]), x90, unitaries.rot_z(v[0])])
+        assert np.allclose(gate.matrix(v), U)
+
+def test_pickle_structure_only():
+    import pickle
+    from qsearch import gatesets
+    gateset = gatesets.QutritCNOTLinear()
+    circuit = ProductGate(gateset.initial_layer(2), *[layer for layer, _ in gateset.search_layers(2)])
+    data = pickle.dumps(circuit)
+    recovered = pickle.loads(data)
+    assert recovered == circuit
+    v = np.random.rand(circuit.num_inputs) * 2 * np.pi
+    assert np.allclose(recovered.matrix(v), circuit.matrix(v))
+    assert b"numpy" not in data
+
+class LegacyPickle():
+    """Pickles like a gate did before gates defined __reduce__: the class and then its plain __dict__."""
+    def __init__(self, gate, state):
+        self.gate = gate
+        self.state = state
+
+    def __reduce__(self):
+        import copyreg
+        return (copyreg._reconstructor, (type(self.gate), object, None), self.state)
+
+def test_unpickle_legacy_state():
+    import pickle
+    inner = KroneckerGate(u, IdentityGate(), xzxz)
+    circuit = ProductGate(KroneckerGate(u, u, u), KroneckerGate(cnot, IdentityGate()), inner)
+    legacy_inner = LegacyPickle(inner, {"num_inputs": inner.num_inputs, "_subgates": inner._subgates, "qudits": inner.qudits})
+    legacy = LegacyPickle(circuit, {"num_inputs": circuit.num_inputs, "_subgates": [*circuit._subgates[:2], legacy_inner], "qudits": circuit.qudits})
+    recovered = pickle.loads(pickle.dumps(legacy))
+    assert type(recovered) is ProductGate and type(recovered._subgates[2]) is KroneckerGate
+    v = np.random.rand(circuit.num_inputs) * 2 * np.pi
+    assert np.allclose(recovered.matrix(v), circuit.matrix(v))
+    assert np.allclose(recovered.mat_jac(v)[1], circuit.mat_jac(v)[1])
+
+@pytest.mark.parametrize("gate", (cnot, KroneckerGate(cnot, IdentityGate()), KroneckerGate(IdentityGate(), cnot, IdentityGate()), KroneckerGate(cnot, cnot), NonadjacentCNOTGate(3, 0, 2), NonadjacentCNOTGate(3, 2, 1)), ids=lambda gate: repr(gate))
+def test_permutation(gate):
+    M = np.random.rand(2**gate.qudits, 2**gate.qudits)
+    assert np.allclose(M[gate._perm], np.matmul(gate.matrix([]), M))
+
+BATCH_GATES = (
+    u, xzxz, ZXZXZGate(), cnot, IdentityGate(),
+    KroneckerGate(u, IdentityGate(), xzxz),
+    ProductGate(cnot, KroneckerGate(u, xzxz), cnot, KroneckerGate(ZXZXZGate(), u)),
+    ProductGate(KroneckerGate(IdentityGate(), ProductGate(cnot, KroneckerGate(xzxz, u))), KroneckerGate(cnot, IdentityGate())),
+)
+
+@pytest.mark.parametrize("gate", BATCH_GATES, ids=lambda gate: repr(gate))
+def test_batch_matrix(gate):
+    V = np.random.rand(5, gate.num_inputs) * 2 * np.pi
+    B = gate.batch_matrix(V)
+    assert B.shape == (5, 2**gate.qudits, 2**gate.qudits)
+    for v, U in zip(V, B):
+        assert np.allclose(U, gate.matrix(v))
+
+def test_cu_matrix():
+    U = unitaries.rot_x(0.3)
+    P0 = np.diag([1, 0]).astype('complex128')
+    P1 = np.diag([0, 1]).astype('complex128')
+    I = np.eye(2, dtype='complex128')
+    assert np.allclose(CUGate(U).matrix([]), np.kron(P0, I) + np.kron(P1, U))
+    assert np.allclose(CUGate(U, flipped=True).matrix([]), np.kron(P0, U) + np.kron(P1, I))
+
+def test_constant_gate_hash():
+    U = unitaries.rot_x(0.3)
+    assert hash(UGate(U, gatename="RX")) == hash(UGate(U, gatename="RX"))
+    assert hash(UGate(U, gatename="RX")) != hash(UGate(U))
+    assert hash(CUGate(U, gatename="CRX")) != hash(CUGate(U, gatename="CRX", flipped=True))
+    assert CUGate(U, gatename="CRX", flipped=True).assemble([], 0) == [("gate", "CRX", (), (1, 0))]
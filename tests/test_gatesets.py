@@ -1,4 +1,5 @@
-from qsearch import gatesets, unitaries, advanced_unitaries, backends
+from qsearch import gatesets, unitaries, advanced_unitaries, backends, parallelizers, compiler, utils, Options
+from qsearch.gates import UGate, CNOTGate
 
 def test_qubit_cnot_linear(project, check_project):
     project['gateset'] = gatesets.QubitCNOTLinear()
@@ -30,3 +31,29 @@ def test_adjacency_list(project, check_project):
     project.add_compilation('qft3', unitaries.qft(8))
     project.run()
     check_project(project)
+
+class DuplicateSuccessorsLinear(gatesets.QubitCNOTLinear):
+    def successors(self, circ, qudits=None):
+        successors = super().successors(circ, qudits)
+        return successors + successors
+
+class CountingParallelizer(parallelizers.SequentialParallelizer):
+    solved = []
+    def solve_circuits_parallel(self, tuples):
+        CountingParallelizer.solved.extend(repr(tup[0]) for tup in tuples)
+        return super().solve_circuits_parallel(tuples)
+
+def test_duplicate_successors():
+    CountingParallelizer.solved = []
+    options = Options(target=unitaries.qft(4), gateset=DuplicateSuccessorsLinear(), parallelizer=CountingParallelizer, skip_duplicate_successors=True)
+    res = compiler.SearchCompiler(options=options).compile()
+    assert utils.matrix_distance_squared(res['structure'].matrix(res['parameters']), unitaries.qft(4)) < 1e-10
+    assert len(CountingParallelizer.solved) > 0
+    assert len(set(CountingParallelizer.solved)) == len(CountingParallelizer.solved)
+
+def test_ugate_successors():
+    gateset = gatesets.QubitCNOTLinear()
+    gateset.cnot = UGate(CNOTGate._cnot, gatename="CNOT")
+    options = Options(target=unitaries.qft(4), gateset=gateset, parallelizer=parallelizers.SequentialParallelizer, skip_duplicate_successors=True)
+    res = compiler.SearchCompiler(options=options).compile()
+    assert utils.matrix_distance_squared(res['structure'].matrix(res['parameters']), unitaries.qft(4)) < 1e-10
@@ -1,4 +1,4 @@
-from qsearch import Options, unitaries, backends
+from qsearch import Options, unitaries, backends, checkpoints, compiler, utils
 
 def test_per_compilation_options(project):
     project['backend'] = backends.SmartDefaultBackend()
@@ -19,3 +19,25 @@ def test_project_clear(project):
     project.clear()
     project.add_compilation("qft3", unitaries.qft(8))
     project.run()
+
+class QueueRecordingCheckpoint(checkpoints.Checkpoint):
+    """Records the size of the search queue each time the compiler checkpoints it."""
+    def __init__(self):
+        self.queue_sizes = []
+
+    def save(self, state):
+        self.queue_sizes.append(len(state[1]))
+
+    def recover(self):
+        return None
+
+    def delete(self):
+        pass
+
+def test_max_queue():
+    checkpoint = QueueRecordingCheckpoint()
+    options = Options(target=unitaries.qft(8), max_queue=4, checkpoint=checkpoint)
+    res = compiler.SearchCompiler(options=options).compile()
+    assert utils.matrix_distance_squared(res['structure'].matrix(res['parameters']), unitaries.qft(8)) < 1e-10
+    assert len(checkpoint.queue_sizes) > 1
+    assert max(checkpoint.queue_sizes) <= 4
@@ -1,4 +1,4 @@
-from qsearch import Project, solvers, unitaries, utils, multistart_solvers, parallelizers, compiler, options
+from qsearch import Project, solvers, unitaries, utils, multistart_solvers, parallelizers, compiler, options, backends
 import scipy as sp
 import os
 try:
@@ -19,6 +19,14 @@ def test_cobyla(project):
     project['solver'] = solvers.COBYLA_Solver()
     project.run()
 
+def test_cma(project, check_project):
+    pytest.importorskip("cma")
+    project.add_compilation('qft2', unitaries.qft(4))
+    project['solver'] = solvers.CMA_Solver()
+    project['backend'] = backends.PythonBackend() # keep the Python circuit so that batch_matrix is used
+    project.run()
+    check_project(project)
+
 def test_bfgs_jac(project):
     project.add_compilation('qft3', qft3)
     project['solver'] = solvers.BFGS_Jac_Solver()
@@ -0,0 +1,37 @@
+import numpy as np
+from qsearch import utils, unitaries
+
+def test_remap():
+    U = np.random.rand(8, 8) + 1j * np.random.rand(8, 8)
+    I = np.eye(2, dtype='complex128')
+    S = np.kron(unitaries.swap, I)
+    assert np.allclose(utils.remap(U, [1, 0, 2]), S @ U @ S)
+    S = np.kron(I, unitaries.swap)
+    assert np.allclose(utils.remap(U, [0, 2, 1]), S @ U @ S)
+
+def test_general_swap():
+    assert np.array_equal(unitaries.general_swap(2), unitaries.swap)
+    S = unitaries.general_swap(3)
+    a, b = np.random.rand(3), np.random.rand(3)
+    assert np.allclose(S @ np.kron(a, b), np.kron(b, a))
+
+def test_remap_qutrits():
+    U = np.random.rand(9, 9) + 1j * np.random.rand(9, 9)
+    S = unitaries.general_swap(3)
+    assert np.allclose(utils.remap(U, [1, 0], d=3), S @ U @ S)
+
+def test_endian_reverse_involution():
+    U = np.random.rand(16, 16) + 1j * np.random.rand(16, 16)
+    assert np.allclose(utils.endian_reverse(utils.endian_reverse(U)), U)
+
+def test_matrix_distance_squared_trace():
+    A = unitaries.qft(8)
+    B = unitaries.rot_x(0.3)
+    B = np.kron(np.kron(B, B), unitaries.rot_z(1.2))
+    assert np.isclose(utils.matrix_distance_squared(A, B), 1 - np.abs(np.trace(A @ B.conj().T)) / 8)
+    assert utils.matrix_distance_squared(A, A * np.exp(0.7j)) < 1e-14
+
+def test_num_qudits():
+    for d in (2, 3, 4):
+        for n in range(1, 16):
+            assert utils.num_qudits(d**n, d) == n